@@ -4,19 +4,21 @@
 包含所有系统配置相关的模块。
 """
 
-from .settings import settings, get_settings
+from .settings import get_settings, reload_settings
 from .database import get_db, get_db_session, init_db
-from .redis import get_redis_client, cache_manager
-from .llm_models import get_model_config, get_agent_model
+from .redis import get_redis_client, get_cache_manager, get_async_cache
+from .llm_models import get_model_config, get_agent_model, get_agent_model_config
 
 __all__ = [
-    "settings",
-    "get_settings", 
+    "get_settings",
+    "reload_settings",
     "get_db",
     "get_db_session",
     "init_db",
     "get_redis_client",
-    "cache_manager",
+    "get_cache_manager",
+    "get_async_cache",
     "get_model_config",
-    "get_agent_model"
+    "get_agent_model",
+    "get_agent_model_config"
 ] 
\ No newline at end of file
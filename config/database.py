@@ -3,47 +3,96 @@
 提供数据库连接池、会话管理和基础操作
 """
 
-from sqlalchemy import create_engine, event
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.exc import DBAPIError, DisconnectionError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import QueuePool
+from sqlalchemy.pool import NullPool, QueuePool
 from contextlib import contextmanager
-from typing import Generator
+from functools import cache, partial
+from typing import Callable, Generator, TypeVar
 import logging
+import os
+import time
 
 from .settings import get_settings
 
 logger = logging.getLogger(__name__)
 
-# 获取配置
-settings = get_settings()
-
-# 创建数据库引擎
-engine = create_engine(
-    settings.database.url,
-    poolclass=QueuePool,
-    pool_size=10,
-    max_overflow=20,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-    echo=settings.debug,
-)
-
-# 创建会话工厂
-SessionLocal = sessionmaker(
-    autocommit=False,
-    autoflush=False,
-    bind=engine
-)
+@cache
+def get_engine() -> Engine:
+    """
+    获取数据库引擎（首次调用时创建，导入模块不会建立连接池）
+    """
+    settings = get_settings()
+    
+    # 按部署角色选择连接池
+    if settings.database.pool_class == "null":
+        pool_options = {"poolclass": NullPool}
+    else:
+        pool_options = {
+            "poolclass": QueuePool,
+            "pool_size": settings.database.pool_size,
+            "max_overflow": settings.database.max_overflow,
+        }
+    
+    engine = create_engine(
+        settings.database.url,
+        **pool_options,
+        # 不在每次检出时执行SELECT 1，只检测空闲较久的连接（见_ping_idle_connection），
+        # 失效连接由pool_recycle回收
+        pool_pre_ping=False,
+        pool_recycle=settings.database.pool_recycle,
+        echo=settings.debug,
+        # 会话参数随连接启动包发送，无需建立连接后再执行SET
+        connect_args={
+            "options": (
+                "-c timezone=UTC "
+                f"-c statement_timeout={settings.database.statement_timeout}"
+            )
+        },
+    )
+    
+    # 检出时检测空闲连接，失效时连接池换用新连接重新检出（在执行任何语句之前，get_db等所有会话均适用）
+    event.listen(engine, "checkin", _record_checkin_time)
+    event.listen(
+        engine,
+        "checkout",
+        partial(_ping_idle_connection, engine.dialect, settings.database.ping_after_idle),
+    )
+    
+    # 检出/检入日志仅在调试模式注册，避免每次连接池操作的日志开销
+    if settings.debug:
+        event.listen(engine, "checkout", receive_checkout)
+        event.listen(engine, "checkin", receive_checkin)
+    
+    return engine
+
+@cache
+def get_session_factory() -> sessionmaker:
+    """
+    获取会话工厂
+    
+    expire_on_commit=False：提交后不失效已加载对象，避免再次访问属性时重新查询；
+    需要跨提交获取最新数据时请显式调用 session.refresh(obj)。
+    """
+    return sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        expire_on_commit=False,
+        bind=get_engine()
+    )
 
 # 创建基础模型类
 Base = declarative_base()
 
+T = TypeVar("T")
+
 def get_db() -> Generator[Session, None, None]:
     """
     获取数据库会话（依赖注入用）
     """
-    db = SessionLocal()
+    db = get_session_factory()()
     try:
         yield db
     except Exception as e:
@@ -58,7 +107,7 @@ def get_db_session() -> Generator[Session, None, None]:
     """
     获取数据库会话（上下文管理器）
     """
-    db = SessionLocal()
+    db = get_session_factory()()
     try:
         yield db
         db.commit()
@@ -69,12 +118,43 @@ def get_db_session() -> Generator[Session, None, None]:
     finally:
         db.close()
 
+def run_with_retry(operation: Callable[[Session], T], retries: int = 1) -> T:
+    """
+    在独立会话中执行数据库操作并提交，操作过程中连接失效时重试
+    
+    未检测到的失效连接在首次使用时才会被发现，SQLAlchemy会将其从连接池作废，重试时使用新连接。
+    operation内不应自行提交；提交失败时不重试，因为写入可能已在服务端生效。
+    """
+    attempt = 0
+    while True:
+        with get_session_factory()() as db:
+            try:
+                result = operation(db)
+            except DBAPIError as e:
+                db.rollback()
+                if not e.connection_invalidated or attempt >= retries:
+                    raise
+                attempt += 1
+                logger.warning(f"数据库连接已失效，第{attempt}次重试: {e}")
+                continue
+            except Exception:
+                db.rollback()
+                raise
+            
+            try:
+                db.commit()
+            except Exception as e:
+                logger.error(f"数据库提交异常: {e}")
+                db.rollback()
+                raise
+            return result
+
 def init_db() -> None:
     """
     初始化数据库表
     """
     try:
-        Base.metadata.create_all(bind=engine)
+        Base.metadata.create_all(bind=get_engine())
         logger.info("数据库表初始化完成")
     except Exception as e:
         logger.error(f"数据库初始化失败: {e}")
@@ -85,7 +165,7 @@ def check_db_connection() -> bool:
     检查数据库连接状态
     """
     try:
-        with engine.connect() as conn:
+        with get_engine().connect() as conn:
             from sqlalchemy import text
             conn.execute(text("SELECT 1"))
         logger.info("数据库连接正常")
@@ -98,27 +178,43 @@ def close_db() -> None:
     """
     关闭数据库连接
     """
+    if not get_engine.cache_info().currsize:
+        return
     try:
-        engine.dispose()
+        get_engine().dispose()
         logger.info("数据库连接已关闭")
     except Exception as e:
         logger.error(f"关闭数据库连接失败: {e}")
 
-# 数据库事件监听器
-@event.listens_for(engine, "connect")
-def set_sqlite_pragma(dbapi_connection, connection_record):
-    """设置数据库连接参数"""
-    if "postgresql" in settings.database.url:
-        # PostgreSQL特定设置
-        with dbapi_connection.cursor() as cursor:
-            cursor.execute("SET timezone TO 'UTC'")
+# 数据库事件监听器（在get_engine中注册）
+def _record_checkin_time(dbapi_connection, connection_record):
+    """记录连接归还时间，用于判断检出时的空闲时长"""
+    connection_record.info["checkin_time"] = time.monotonic()
+
+def _ping_idle_connection(dialect, idle_seconds, dbapi_connection, connection_record, connection_proxy):
+    """检出空闲超过idle_seconds的连接时先检测，失效则抛出DisconnectionError由连接池重新检出"""
+    checkin_time = connection_record.info.get("checkin_time")
+    if checkin_time is None or time.monotonic() - checkin_time < idle_seconds:
+        return
+    try:
+        dialect.do_ping(dbapi_connection)
+    except Exception as e:
+        logger.warning(f"空闲数据库连接已失效，换用新连接: {e}")
+        raise DisconnectionError() from e
 
-@event.listens_for(engine, "checkout")
 def receive_checkout(dbapi_connection, connection_record, connection_proxy):
     """连接检出时的处理"""
     logger.debug("数据库连接已检出")
 
-@event.listens_for(engine, "checkin")
 def receive_checkin(dbapi_connection, connection_record):
     """连接检入时的处理"""
-    logger.debug("数据库连接已检入") 
\ No newline at end of file
+    logger.debug("数据库连接已检入")
+
+def _dispose_engine_after_fork() -> None:
+    """fork后子进程丢弃继承的连接（close=False：套接字仍属于父进程）"""
+    if get_engine.cache_info().currsize:
+        get_engine().dispose(close=False)
+
+# Gunicorn/Celery prefork等fork出的子进程按需重建连接池
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispose_engine_after_fork)
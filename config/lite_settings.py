@@ -0,0 +1,45 @@
+"""
+轻量配置结构
+
+基于msgspec.Struct的只读配置，用于替代没有校验器的叶子配置（Redis、日志、交易），
+实例没有__dict__，构建开销和每个worker的内存占用都远小于Pydantic模型。
+设置 LITE_SETTINGS=true 并安装msgspec后启用。
+"""
+
+from functools import cache
+from typing import Any, Type
+
+import msgspec
+
+from .settings import EnvSettings
+
+
+@cache
+def struct_for(model: Type[EnvSettings]) -> type:
+    """根据Pydantic配置类生成字段相同的只读Struct类型"""
+    fields = [
+        (
+            name,
+            field.annotation,
+            msgspec.field(default_factory=field.default_factory)
+            if field.default_factory is not None
+            else field.default,
+        )
+        for name, field in model.model_fields.items()
+    ]
+
+    # 派生属性（如Redis连接URL）作为字段在构建时计算一次，与原配置类的cached_property一致
+    if "url" in model.__dict__:
+        fields.append(("url", str, ""))
+
+    return msgspec.defstruct(f"{model.__name__}Struct", fields, frozen=True)
+
+
+def load_struct(model: Type[EnvSettings]) -> Any:
+    """从环境变量快照构建轻量配置，取值按Pydantic的规则转换，与完整配置接受的取值相同"""
+    struct = msgspec.convert(model.typed_env_values(), struct_for(model))
+
+    url = model.__dict__.get("url")
+    if url is not None:
+        struct = msgspec.structs.replace(struct, url=url.func(struct))
+    return struct
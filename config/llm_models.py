@@ -5,15 +5,14 @@ LLM模型配置和管理
 """
 
 from enum import Enum
+from functools import cache, lru_cache
+from types import MappingProxyType
 from typing import Dict, Any, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import logging
 
 from config.settings import get_settings
 
-# 获取配置
-settings = get_settings()
-
 # 配置日志
 logger = logging.getLogger(__name__)
 
@@ -34,7 +33,7 @@ class ModelType(Enum):
     CHAT = "chat"            # 对话模型
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ModelConfig:
     """模型配置数据类"""
     provider: LLMProvider
@@ -47,6 +46,53 @@ class ModelConfig:
     max_retries: int = 3
     supports_function_calling: bool = False
     cost_per_1k_tokens: float = 0.0
+    cost_per_token: float = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        # 预计算单token成本，计费时只需一次乘法
+        object.__setattr__(self, "cost_per_token", self.cost_per_1k_tokens / 1000.0)
+
+
+# 内置模型表: (名称, 提供商, 模型ID, 覆盖参数)
+MODEL_TABLE = (
+    # OpenAI模型配置
+    ("gpt-4o", LLMProvider.OPENAI, "gpt-4o", {
+        "max_tokens": 4000,
+        "supports_function_calling": True,
+        "cost_per_1k_tokens": 0.03,
+    }),
+    ("gpt-4o-mini", LLMProvider.OPENAI, "gpt-4o-mini", {
+        "max_tokens": 2000,
+        "supports_function_calling": True,
+        "cost_per_1k_tokens": 0.0015,
+    }),
+    ("o1-preview", LLMProvider.OPENAI, "o1-preview", {
+        "max_tokens": 8000,
+        "temperature": 1.0,  # o1模型不支持调整temperature
+        "timeout": 60,  # 推理模型需要更长时间
+        "supports_function_calling": False,
+        "cost_per_1k_tokens": 0.15,
+    }),
+    
+    # DeepSeek模型配置
+    ("deepseek-chat", LLMProvider.DEEPSEEK, "deepseek-chat", {
+        "max_tokens": 4000,
+        "supports_function_calling": True,
+        "cost_per_1k_tokens": 0.002,
+    }),
+    ("deepseek-coder", LLMProvider.DEEPSEEK, "deepseek-coder", {
+        "max_tokens": 4000,
+        "supports_function_calling": True,
+        "cost_per_1k_tokens": 0.002,
+    }),
+    
+    # Anthropic模型配置
+    ("claude-3-sonnet", LLMProvider.ANTHROPIC, "claude-3-sonnet-20240229", {
+        "max_tokens": 4000,
+        "supports_function_calling": True,
+        "cost_per_1k_tokens": 0.015,
+    }),
+)
 
 
 class LLMModelManager:
@@ -54,100 +100,52 @@ class LLMModelManager:
     
     def __init__(self):
         self._models: Dict[str, ModelConfig] = {}
+        self._agent_models: Dict[str, ModelConfig] = {}
+        self._default_agent_model: Optional[ModelConfig] = None
         self._init_models()
+        self._resolve_agent_models()
     
     def _init_models(self):
         """初始化所有模型配置"""
+        settings = get_settings()
         
-        # OpenAI模型配置
-        if settings.llm.openai_api_key:
-            self._models.update({
-                "gpt-4o": ModelConfig(
-                    provider=LLMProvider.OPENAI,
-                    model_name="gpt-4o",
-                    api_key=settings.llm.openai_api_key,
-                    base_url=settings.llm.openai_base_url,
-                    max_tokens=4000,
-                    temperature=0.1,
-                    timeout=settings.llm.default_timeout,
-                    max_retries=settings.llm.max_retries,
-                    supports_function_calling=True,
-                    cost_per_1k_tokens=0.03
-                ),
-                "gpt-4o-mini": ModelConfig(
-                    provider=LLMProvider.OPENAI,
-                    model_name="gpt-4o-mini",
-                    api_key=settings.llm.openai_api_key,
-                    base_url=settings.llm.openai_base_url,
-                    max_tokens=2000,
-                    temperature=0.1,
-                    timeout=settings.llm.default_timeout,
-                    max_retries=settings.llm.max_retries,
-                    supports_function_calling=True,
-                    cost_per_1k_tokens=0.0015
-                ),
-                "o1-preview": ModelConfig(
-                    provider=LLMProvider.OPENAI,
-                    model_name="o1-preview",
-                    api_key=settings.llm.openai_api_key,
-                    base_url=settings.llm.openai_base_url,
-                    max_tokens=8000,
-                    temperature=1.0,  # o1模型不支持调整temperature
-                    timeout=60,  # 推理模型需要更长时间
-                    max_retries=settings.llm.max_retries,
-                    supports_function_calling=False,
-                    cost_per_1k_tokens=0.15
-                )
-            })
+        # 各提供商共享的调用参数
+        common = {
+            "timeout": settings.llm.default_timeout,
+            "max_retries": settings.llm.max_retries,
+        }
         
-        # DeepSeek模型配置
-        if settings.llm.deepseek_api_key:
-            self._models.update({
-                "deepseek-chat": ModelConfig(
-                    provider=LLMProvider.DEEPSEEK,
-                    model_name="deepseek-chat",
-                    api_key=settings.llm.deepseek_api_key,
-                    base_url=settings.llm.deepseek_base_url,
-                    max_tokens=4000,
-                    temperature=0.1,
-                    timeout=settings.llm.default_timeout,
-                    max_retries=settings.llm.max_retries,
-                    supports_function_calling=True,
-                    cost_per_1k_tokens=0.002
-                ),
-                "deepseek-coder": ModelConfig(
-                    provider=LLMProvider.DEEPSEEK,
-                    model_name="deepseek-coder",
-                    api_key=settings.llm.deepseek_api_key,
-                    base_url=settings.llm.deepseek_base_url,
-                    max_tokens=4000,
-                    temperature=0.1,
-                    timeout=settings.llm.default_timeout,
-                    max_retries=settings.llm.max_retries,
-                    supports_function_calling=True,
-                    cost_per_1k_tokens=0.002
-                )
-            })
+        # 提供商连接信息: (API密钥, 基础URL)
+        credentials = {
+            LLMProvider.OPENAI: (settings.llm.openai_api_key, settings.llm.openai_base_url),
+            LLMProvider.DEEPSEEK: (settings.llm.deepseek_api_key, settings.llm.deepseek_base_url),
+            LLMProvider.ANTHROPIC: (settings.llm.anthropic_api_key, "https://api.anthropic.com"),
+        }
         
-        # Anthropic模型配置
-        if settings.llm.anthropic_api_key:
-            self._models.update({
-                "claude-3-sonnet": ModelConfig(
-                    provider=LLMProvider.ANTHROPIC,
-                    model_name="claude-3-sonnet-20240229",
-                    api_key=settings.llm.anthropic_api_key,
-                    base_url="https://api.anthropic.com",
-                    max_tokens=4000,
-                    temperature=0.1,
-                    timeout=settings.llm.default_timeout,
-                    max_retries=settings.llm.max_retries,
-                    supports_function_calling=True,
-                    cost_per_1k_tokens=0.015
-                )
-            })
+        # 仅注册已配置API密钥的提供商模型
+        for name, provider, model_name, overrides in MODEL_TABLE:
+            api_key, base_url = credentials[provider]
+            if not api_key:
+                continue
+            self._models[name] = ModelConfig(
+                provider=provider,
+                model_name=model_name,
+                api_key=api_key,
+                base_url=base_url,
+                **{**common, **overrides}
+            )
         
         logger.info(f"初始化了 {len(self._models)} 个LLM模型")
     
+    def _resolve_agent_models(self):
+        """预解析智能体角色对应的模型配置，未注册的模型回退到默认模型"""
+        self._default_agent_model = self._models.get(DEFAULT_AGENT_MODEL)
+        self._agent_models = {}
+        for role, model_name in AGENT_MODEL_MAPPING.items():
+            config = self._models.get(model_name) or self._default_agent_model
+            if config:
+                self._agent_models[role] = config
+    
     def get_model(self, model_name: str) -> Optional[ModelConfig]:
         """获取模型配置"""
         return self._models.get(model_name)
@@ -178,20 +176,31 @@ class LLMModelManager:
             if name in recommended_models
         }
     
+    def get_agent_model_config(self, agent_role: str) -> Optional[ModelConfig]:
+        """获取智能体角色对应的模型配置"""
+        return self._agent_models.get(agent_role, self._default_agent_model)
+    
     def add_model(self, name: str, config: ModelConfig):
         """添加新模型配置"""
         self._models[name] = config
+        self._resolve_agent_models()
+        get_model_config.cache_clear()
         logger.info(f"添加新模型: {name}")
     
     def remove_model(self, name: str):
         """移除模型配置"""
         if name in self._models:
             del self._models[name]
+            self._resolve_agent_models()
+            get_model_config.cache_clear()
             logger.info(f"移除模型: {name}")
 
 
-# 智能体角色对应的推荐模型
-AGENT_MODEL_MAPPING = {
+# 未配置角色时使用的默认模型
+DEFAULT_AGENT_MODEL = "gpt-4o-mini"
+
+# 智能体角色对应的推荐模型（只读映射）
+AGENT_MODEL_MAPPING = MappingProxyType({
     # 分析师团队 - 需要深度分析能力
     "fundamental_analyst": "gpt-4o",
     "technical_analyst": "gpt-4o",
@@ -214,35 +223,45 @@ AGENT_MODEL_MAPPING = {
     
     # 基金经理 - 需要综合判断
     "fund_manager": "o1-preview",
-}
+})
 
 
-# 全局模型管理器实例
-model_manager = LLMModelManager()
+# 全局模型管理器实例（首次使用时创建，仅导入类型时不解析配置）
+@cache
+def get_model_manager() -> LLMModelManager:
+    """获取模型管理器"""
+    return LLMModelManager()
 
 
+@lru_cache(maxsize=64)
 def get_model_config(model_name: str) -> Optional[ModelConfig]:
-    """获取模型配置"""
-    return model_manager.get_model(model_name)
+    """获取模型配置（增删模型时失效）"""
+    return get_model_manager().get_model(model_name)
 
 
+@lru_cache(maxsize=32)
 def get_agent_model(agent_role: str) -> str:
     """根据智能体角色获取推荐模型"""
-    return AGENT_MODEL_MAPPING.get(agent_role, "gpt-4o-mini")
+    return AGENT_MODEL_MAPPING.get(agent_role, DEFAULT_AGENT_MODEL)
+
+
+def get_agent_model_config(agent_role: str) -> Optional[ModelConfig]:
+    """根据智能体角色获取模型配置（已预解析，无需再按模型名查找）"""
+    return get_model_manager().get_agent_model_config(agent_role)
 
 
 def get_available_models() -> Dict[str, ModelConfig]:
     """获取所有可用模型"""
-    return model_manager.get_available_models()
+    return get_model_manager().get_available_models()
 
 
 def estimate_cost(model_name: str, token_count: int) -> float:
     """估算模型调用成本"""
     config = get_model_config(model_name)
-    if not config:
+    if not config or not config.cost_per_token:
         return 0.0
     
-    return (token_count / 1000) * config.cost_per_1k_tokens
+    return token_count * config.cost_per_token
 
 
 def get_model_capabilities(model_name: str) -> Dict[str, Any]:
@@ -4,17 +4,20 @@ Redis缓存配置和管理
 """
 
 import redis
-import json
+import redis.asyncio as aioredis
+from redis.utils import HIREDIS_AVAILABLE
+import orjson
+import msgpack
 import logging
-from typing import Optional, Any, Dict, List
+import math
+import os
+from functools import cache
+from typing import Optional, Any, AsyncGenerator, Dict, List
 
 from .settings import get_settings
 
 logger = logging.getLogger(__name__)
 
-# 获取配置
-settings = get_settings()
-
 class RedisManager:
     """Redis连接管理器"""
     
@@ -25,16 +28,12 @@ class RedisManager:
     def _connect(self):
         """建立Redis连接"""
         try:
-            self.client = redis.from_url(
-                settings.redis.url,
-                decode_responses=True,
-                socket_connect_timeout=5,
-                socket_timeout=5
-            )
+            # 重连时复用同一连接池，无需重新解析地址和建立套接字
+            self.client = redis.Redis(connection_pool=get_connection_pool())
             
             # 测试连接
             self.client.ping()
-            logger.info("Redis连接成功")
+            logger.info(f"Redis连接成功（hiredis解析器: {'已启用' if HIREDIS_AVAILABLE else '未安装'}）")
             
         except Exception as e:
             logger.error(f"Redis连接失败: {e}")
@@ -56,17 +55,67 @@ class RedisManager:
             pass
         return False
 
+# 缓存值头部：NUL字节+类型标记。JSON文本和普通字符串不会以NUL开头，
+# 因此可与升级前写入的无标记旧数据区分，读取时按标记分支，无需try/except
+_TAG_JSON = b"\x00J"
+_TAG_MSGPACK = b"\x00M"
+_TAG_STR = b"\x00S"
+_TAG_SIZE = len(_TAG_JSON)
+
+def _dumps(value: Any, packed: bool = False) -> bytes:
+    """
+    序列化缓存值，字符串原样存储，其余值（dict/list/数字/布尔/None）使用orjson
+    
+    packed=True时使用msgpack，适用于仅供Python读取的数值密集型数据（行情、指标等）。
+    """
+    if packed:
+        return _TAG_MSGPACK + msgpack.packb(value, use_bin_type=True)
+    if isinstance(value, str):
+        return _TAG_STR + value.encode()
+    if isinstance(value, bytes):
+        return _TAG_STR + value
+    encoded = orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    # orjson将NaN/±inf编码为null；仅在出现null时检查，含非有限浮点数的数据（如指标预热期）改用msgpack保留原值
+    if b"null" in encoded and _has_non_finite(value):
+        return _TAG_MSGPACK + msgpack.packb(value, use_bin_type=True)
+    return _TAG_JSON + encoded
+
+def _has_non_finite(value: Any) -> bool:
+    """是否包含NaN/±inf浮点数"""
+    if isinstance(value, float):
+        return not math.isfinite(value)
+    if isinstance(value, dict):
+        return any(_has_non_finite(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_non_finite(item) for item in value)
+    return False
+
+def _loads(raw: bytes) -> Any:
+    """反序列化缓存值"""
+    tag, payload = raw[:_TAG_SIZE], raw[_TAG_SIZE:]
+    if tag == _TAG_JSON:
+        return orjson.loads(payload)
+    if tag == _TAG_MSGPACK:
+        return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+    if tag == _TAG_STR:
+        return payload.decode()
+    
+    # 兼容无类型标记的旧数据（与原json.loads读取逻辑一致）
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return raw.decode()
+
 class CacheManager:
     """缓存管理器"""
     
     def __init__(self, redis_client):
         self.redis = redis_client
     
-    def set(self, key: str, value: Any, expire: Optional[int] = None) -> bool:
-        """设置缓存"""
+    def set(self, key: str, value: Any, expire: Optional[int] = None, packed: bool = False) -> bool:
+        """设置缓存（packed=True使用msgpack编码）"""
         try:
-            if isinstance(value, (dict, list)):
-                value = json.dumps(value, ensure_ascii=False)
+            value = _dumps(value, packed)
             
             if expire:
                 return self.redis.setex(key, expire, value)
@@ -83,11 +132,7 @@ class CacheManager:
             if value is None:
                 return None
             
-            # 尝试JSON解析
-            try:
-                return json.loads(value)
-            except (json.JSONDecodeError, TypeError):
-                return value
+            return _loads(value)
         except Exception as e:
             logger.error(f"获取缓存失败 {key}: {e}")
             return None
@@ -107,17 +152,173 @@ class CacheManager:
         except Exception as e:
             logger.error(f"检查缓存存在性失败 {key}: {e}")
             return False
+    
+    def mget(self, keys: List[str]) -> List[Any]:
+        """批量获取缓存（单次往返），未命中的键返回None"""
+        if not keys:
+            return []
+        try:
+            values = self.redis.mget(keys)
+            return [None if value is None else _loads(value) for value in values]
+        except Exception as e:
+            logger.error(f"批量获取缓存失败 {len(keys)}个键: {e}")
+            return [None] * len(keys)
+    
+    def mset(self, mapping: Dict[str, Any], expire: Optional[int] = None, packed: bool = False) -> bool:
+        """批量设置缓存（管道提交，单次往返）"""
+        if not mapping:
+            return True
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for key, value in mapping.items():
+                if expire:
+                    pipe.setex(key, expire, _dumps(value, packed))
+                else:
+                    pipe.set(key, _dumps(value, packed))
+            return all(pipe.execute())
+        except Exception as e:
+            logger.error(f"批量设置缓存失败 {len(mapping)}个键: {e}")
+            return False
+    
+    def clear_pattern(self, pattern: str, batch_size: int = 500) -> int:
+        """按模式清除缓存，使用SCAN+UNLINK避免阻塞Redis"""
+        deleted = 0
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for key in self.redis.scan_iter(match=pattern, count=batch_size):
+                pipe.unlink(key)
+                if len(pipe) >= batch_size:
+                    deleted += sum(pipe.execute())
+            if len(pipe):
+                deleted += sum(pipe.execute())
+            return deleted
+        except Exception as e:
+            logger.error(f"按模式清除缓存失败 {pattern}: {e}")
+            return deleted
+
+class AsyncCacheManager:
+    """异步缓存管理器（FastAPI路由使用，Celery等同步场景使用CacheManager）"""
+    
+    def __init__(self, redis_client: aioredis.Redis):
+        self.redis = redis_client
+    
+    async def set(self, key: str, value: Any, expire: Optional[int] = None, packed: bool = False) -> bool:
+        """设置缓存（packed=True使用msgpack编码）"""
+        try:
+            value = _dumps(value, packed)
+            
+            if expire:
+                return await self.redis.setex(key, expire, value)
+            else:
+                return await self.redis.set(key, value)
+        except Exception as e:
+            logger.error(f"设置缓存失败 {key}: {e}")
+            return False
+    
+    async def get(self, key: str):
+        """获取缓存"""
+        try:
+            value = await self.redis.get(key)
+            if value is None:
+                return None
+            
+            return _loads(value)
+        except Exception as e:
+            logger.error(f"获取缓存失败 {key}: {e}")
+            return None
+    
+    async def delete(self, key: str) -> bool:
+        """删除缓存"""
+        try:
+            return bool(await self.redis.delete(key))
+        except Exception as e:
+            logger.error(f"删除缓存失败 {key}: {e}")
+            return False
+    
+    async def exists(self, key: str) -> bool:
+        """检查缓存是否存在"""
+        try:
+            return bool(await self.redis.exists(key))
+        except Exception as e:
+            logger.error(f"检查缓存存在性失败 {key}: {e}")
+            return False
+    
+    async def mget(self, keys: List[str]) -> List[Any]:
+        """批量获取缓存（单次往返），未命中的键返回None"""
+        if not keys:
+            return []
+        try:
+            values = await self.redis.mget(keys)
+            return [None if value is None else _loads(value) for value in values]
+        except Exception as e:
+            logger.error(f"批量获取缓存失败 {len(keys)}个键: {e}")
+            return [None] * len(keys)
+    
+    async def close(self) -> None:
+        """关闭连接池"""
+        try:
+            await self.redis.aclose()
+        except Exception as e:
+            logger.error(f"关闭异步Redis连接失败: {e}")
+
+# 全局实例（首次使用时创建，导入模块不会连接Redis）
+@cache
+def get_connection_pool() -> redis.ConnectionPool:
+    """获取同步Redis连接池"""
+    settings = get_settings()
+    return redis.ConnectionPool.from_url(
+        settings.redis.url,
+        max_connections=settings.redis.max_connections,
+        decode_responses=False,
+        socket_connect_timeout=5,
+        socket_timeout=5
+    )
+
+@cache
+def get_redis_manager() -> RedisManager:
+    """获取Redis连接管理器"""
+    return RedisManager()
+
+@cache
+def get_async_cache_manager() -> AsyncCacheManager:
+    """获取异步缓存管理器，所有请求共享一个连接池"""
+    settings = get_settings()
+    pool = aioredis.ConnectionPool.from_url(
+        settings.redis.url,
+        max_connections=settings.redis.max_connections,
+        socket_connect_timeout=5,
+        socket_timeout=5
+    )
+    return AsyncCacheManager(aioredis.Redis.from_pool(pool))
 
 def get_redis_client():
     """获取Redis客户端"""
-    return redis_manager.get_client()
+    return get_redis_manager().get_client()
+
+def get_cache_manager() -> Optional[CacheManager]:
+    """获取缓存管理器，Redis不可用时返回None"""
+    client = get_redis_client()
+    return CacheManager(client) if client else None
 
 def check_redis_connection() -> bool:
     """检查Redis连接状态"""
-    return redis_manager.is_connected()
+    return get_redis_manager().is_connected()
+
+async def get_async_cache() -> AsyncGenerator[AsyncCacheManager, None]:
+    """获取异步缓存管理器（FastAPI依赖注入用）"""
+    yield get_async_cache_manager()
+
+async def close_async_cache() -> None:
+    """关闭异步缓存连接池（仅在已创建时）"""
+    if get_async_cache_manager.cache_info().currsize:
+        await get_async_cache_manager().close()
 
-# 全局实例
-redis_manager = RedisManager()
-cache_manager = CacheManager(redis_manager.get_client()) if redis_manager.get_client() else None
+def _reset_pools_after_fork() -> None:
+    """fork后子进程丢弃继承的Redis连接，不关闭父进程的套接字"""
+    if get_connection_pool.cache_info().currsize:
+        get_connection_pool().reset()
+    if get_async_cache_manager.cache_info().currsize:
+        get_async_cache_manager().redis.connection_pool.reset()
 
- 
\ No newline at end of file
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_pools_after_fork)
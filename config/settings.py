@@ -3,154 +3,291 @@ TradingAgents 系统配置管理
 统一管理所有配置项，支持环境变量覆盖
 """
 
-from typing import Optional, List
-from pydantic import Field, validator
-from pydantic_settings import BaseSettings
+from functools import cached_property, lru_cache
+from typing import Any, Dict, Literal, Optional, List
+from pydantic import BaseModel, Field, TypeAdapter, field_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from dotenv import dotenv_values
+import logging
 import os
 
-class DatabaseSettings(BaseSettings):
+logger = logging.getLogger(__name__)
+
+# 由.env写入os.environ的键值；重新加载时只更新仍保持该值的键，进程自带或运行时修改的环境变量始终优先
+_dotenv_written: Dict[str, str] = {}
+
+def _load_dotenv() -> None:
+    """
+    将.env载入os.environ，不覆盖进程自带的环境变量
+    
+    导入时调用一次，reload_settings时再次调用以同步.env的修改和删除。
+    """
+    values = {key: value for key, value in dotenv_values(".env").items() if value is not None}
+    
+    # 上次写入后被运行时修改或删除的键不再由.env管理
+    owned = {key for key, value in _dotenv_written.items() if os.environ.get(key) == value}
+    for key in owned - values.keys():
+        os.environ.pop(key)
+    
+    _dotenv_written.clear()
+    for key, value in values.items():
+        if key in owned or key not in os.environ:
+            os.environ[key] = value
+            _dotenv_written[key] = value
+
+_load_dotenv()
+
+@lru_cache(maxsize=None)
+def _field_adapter(annotation) -> TypeAdapter:
+    """字段类型转换器（按类型缓存）"""
+    return TypeAdapter(annotation)
+
+def _env_flag(name: str) -> bool:
+    """读取布尔型开关环境变量，未设置或为空时为False，取值规则与布尔配置字段一致"""
+    value = os.environ.get(name, "").strip()
+    return bool(value) and _field_adapter(bool).validate_python(value)
+
+# 字段描述仅在生成配置文档时保留（设置 SETTINGS_WITH_SCHEMA_DOCS=1），
+# 默认丢弃以减少模型构建时的schema生成开销和常驻内存
+_WITH_SCHEMA_DOCS = _env_flag("SETTINGS_WITH_SCHEMA_DOCS")
+
+def _desc(text: str) -> Optional[str]:
+    """字段描述（未开启文档模式时返回None）"""
+    return text if _WITH_SCHEMA_DOCS else None
+
+@lru_cache(maxsize=1)
+def _env_snapshot() -> Dict[str, str]:
+    """环境变量快照（已包含.env中的值），键统一转为大写"""
+    return {key.upper(): value for key, value in os.environ.items()}
+
+@lru_cache(maxsize=None)
+def _env_section(prefix: str) -> Dict[str, str]:
+    """按前缀提取环境变量，键去掉前缀并转为小写"""
+    return {
+        key[len(prefix):].lower(): value
+        for key, value in _env_snapshot().items()
+        if key.startswith(prefix)
+    }
+
+class EnvSettings(BaseSettings):
+    """
+    配置基类
+    
+    通过from_env基于一次性解析的环境变量快照构建，各配置类不再分别扫描os.environ；
+    直接实例化（如DatabaseSettings()）仍按pydantic-settings的默认方式读取环境变量。
+    """
+    
+    # 派生属性（如连接URL）使用cached_property，计算一次后复用
+    model_config = SettingsConfigDict(ignored_types=(cached_property,))
+    
+    @classmethod
+    def env_values(cls) -> Dict[str, str]:
+        """从环境变量快照中取出本配置类的字段值"""
+        section = _env_section(cls.model_config.get("env_prefix", "").upper())
+        return {name: section[name] for name in cls.model_fields if name in section}
+    
+    @classmethod
+    def typed_env_values(cls) -> Dict[str, Any]:
+        """按字段类型转换后的字段值，转换规则与Pydantic校验一致（供轻量配置使用）"""
+        return {
+            name: _field_adapter(cls.model_fields[name].annotation).validate_python(value)
+            for name, value in cls.env_values().items()
+        }
+    
+    @classmethod
+    def from_env(cls):
+        """从环境变量快照构建配置（跳过BaseSettings.__init__中的配置源解析，只校验快照中的值）"""
+        settings = cls.__new__(cls)
+        BaseModel.__init__(settings, **cls.env_values())
+        return settings
+
+class DatabaseSettings(EnvSettings):
     """数据库配置"""
-    host: str = Field(default="localhost", description="数据库主机")
-    port: int = Field(default=5432, description="数据库端口")
-    username: str = Field(default="postgres", description="数据库用户名")
-    password: str = Field(default="password", description="数据库密码")
-    database: str = Field(default="trading_agents", description="数据库名")
+    host: str = Field(default="localhost", description=_desc("数据库主机"))
+    port: int = Field(default=5432, description=_desc("数据库端口"))
+    username: str = Field(default="postgres", description=_desc("数据库用户名"))
+    password: str = Field(default="password", description=_desc("数据库密码"))
+    database: str = Field(default="trading_agents", description=_desc("数据库名"))
+    
+    # 连接池配置：API服务使用queue，Celery/脚本等fork或短生命周期进程使用null
+    pool_class: Literal["queue", "null"] = Field(default="queue", description=_desc("连接池类型"))
+    pool_size: int = Field(default=20, description=_desc("连接池大小"))
+    max_overflow: int = Field(default=30, description=_desc("连接池最大溢出连接数"))
+    pool_recycle: int = Field(default=900, description=_desc("连接回收时间（秒），需小于数据库空闲超时"))
+    ping_after_idle: int = Field(default=10, description=_desc("检出时检测空闲超过该秒数的连接，失效则换用新连接"))
+    statement_timeout: int = Field(default=30000, description=_desc("SQL语句超时时间（毫秒）"))
     
-    @property
+    @cached_property
     def url(self) -> str:
         """获取数据库连接URL"""
         return f"postgresql://{self.username}:{self.password}@{self.host}:{self.port}/{self.database}"
     
-    class Config:
-        env_prefix = "DB_"
+    model_config = SettingsConfigDict(env_prefix="DB_")
 
-class RedisSettings(BaseSettings):
+class RedisSettings(EnvSettings):
     """Redis配置"""
-    host: str = Field(default="localhost", description="Redis主机")
-    port: int = Field(default=6379, description="Redis端口")
-    password: Optional[str] = Field(default=None, description="Redis密码")
-    db: int = Field(default=0, description="Redis数据库编号")
+    host: str = Field(default="localhost", description=_desc("Redis主机"))
+    port: int = Field(default=6379, description=_desc("Redis端口"))
+    password: Optional[str] = Field(default=None, description=_desc("Redis密码"))
+    db: int = Field(default=0, description=_desc("Redis数据库编号"))
+    max_connections: int = Field(default=50, description=_desc("连接池最大连接数"))
     
-    @property
+    @cached_property
     def url(self) -> str:
         """获取Redis连接URL"""
         if self.password:
             return f"redis://:{self.password}@{self.host}:{self.port}/{self.db}"
         return f"redis://{self.host}:{self.port}/{self.db}"
     
-    class Config:
-        env_prefix = "REDIS_"
+    model_config = SettingsConfigDict(env_prefix="REDIS_")
 
-class LLMSettings(BaseSettings):
+class LLMSettings(EnvSettings):
     """LLM配置"""
-    openai_api_key: Optional[str] = Field(default=None, description="OpenAI API密钥")
-    openai_base_url: str = Field(default="https://api.openai.com/v1", description="OpenAI API基础URL")
-    deepseek_api_key: Optional[str] = Field(default=None, description="DeepSeek API密钥")
-    deepseek_base_url: str = Field(default="https://api.deepseek.com/v1", description="DeepSeek API基础URL")
-    anthropic_api_key: Optional[str] = Field(default=None, description="Anthropic API密钥")
+    openai_api_key: Optional[str] = Field(default=None, description=_desc("OpenAI API密钥"))
+    openai_base_url: str = Field(default="https://api.openai.com/v1", description=_desc("OpenAI API基础URL"))
+    deepseek_api_key: Optional[str] = Field(default=None, description=_desc("DeepSeek API密钥"))
+    deepseek_base_url: str = Field(default="https://api.deepseek.com/v1", description=_desc("DeepSeek API基础URL"))
+    anthropic_api_key: Optional[str] = Field(default=None, description=_desc("Anthropic API密钥"))
     
     # 模型配置
-    default_model: str = Field(default="gpt-3.5-turbo", description="默认使用的模型")
-    max_tokens: int = Field(default=4000, description="最大token数")
-    temperature: float = Field(default=0.7, description="温度参数")
+    default_model: str = Field(default="gpt-3.5-turbo", description=_desc("默认使用的模型"))
+    max_tokens: int = Field(default=4000, description=_desc("最大token数"))
+    temperature: float = Field(default=0.7, description=_desc("温度参数"))
+    default_timeout: int = Field(default=30, description=_desc("默认请求超时时间（秒）"))
+    max_retries: int = Field(default=3, description=_desc("最大重试次数"))
     
-    class Config:
-        env_prefix = "LLM_"
+    model_config = SettingsConfigDict(env_prefix="LLM_")
 
-class DataSourceSettings(BaseSettings):
+class DataSourceSettings(EnvSettings):
     """数据源配置"""
-    tushare_token: Optional[str] = Field(default=None, description="Tushare API令牌")
-    yahoo_finance_enabled: bool = Field(default=True, description="是否启用Yahoo Finance")
-    alpha_vantage_key: Optional[str] = Field(default=None, description="Alpha Vantage API密钥")
+    tushare_token: Optional[str] = Field(default=None, description=_desc("Tushare API令牌"))
+    yahoo_finance_enabled: bool = Field(default=True, description=_desc("是否启用Yahoo Finance"))
+    alpha_vantage_key: Optional[str] = Field(default=None, description=_desc("Alpha Vantage API密钥"))
     
     # 数据更新频率（分钟）
-    realtime_update_interval: int = Field(default=1, description="实时数据更新间隔")
-    daily_update_time: str = Field(default="18:00", description="日线数据更新时间")
+    realtime_update_interval: int = Field(default=1, description=_desc("实时数据更新间隔"))
+    daily_update_time: str = Field(default="18:00", description=_desc("日线数据更新时间"))
     
-    class Config:
-        env_prefix = "DATA_"
+    model_config = SettingsConfigDict(env_prefix="DATA_")
 
-class SecuritySettings(BaseSettings):
+class SecuritySettings(EnvSettings):
     """安全配置"""
-    secret_key: str = Field(default="your-secret-key-change-in-production", description="JWT密钥")
-    algorithm: str = Field(default="HS256", description="JWT算法")
-    access_token_expire_minutes: int = Field(default=30, description="访问令牌过期时间（分钟）")
+    secret_key: str = Field(default="your-secret-key-change-in-production", description=_desc("JWT密钥"))
+    algorithm: str = Field(default="HS256", description=_desc("JWT算法"))
+    access_token_expire_minutes: int = Field(default=30, description=_desc("访问令牌过期时间（分钟）"))
     
     # API限流
-    rate_limit_per_minute: int = Field(default=100, description="每分钟API调用限制")
+    rate_limit_per_minute: int = Field(default=100, description=_desc("每分钟API调用限制"))
+    
+    # CORS（由入口网关统一处理时可关闭）
+    cors_enabled: bool = Field(default=True, description=_desc("是否启用应用内CORS中间件"))
     
-    class Config:
-        env_prefix = "SECURITY_"
+    model_config = SettingsConfigDict(env_prefix="SECURITY_")
+
+# loguru日志格式（供配置loguru输出时使用，当前应用日志走标准库logging，尚未读取该配置）。
+# 彩色格式的标签需在每条日志记录上解析，仅在开启 LOG_COLOR 时使用（本地终端调试）；
+# 默认使用纯文本格式，降低每条记录的格式化开销
+_COLOR_LOG_FORMAT = "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
+_PLAIN_LOG_FORMAT = "{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}"
+
+def _default_log_format() -> str:
+    """默认日志格式（LOG_FORMAT显式配置时不使用）"""
+    return _COLOR_LOG_FORMAT if _env_flag("LOG_COLOR") else _PLAIN_LOG_FORMAT
 
-class LoggingSettings(BaseSettings):
+class LoggingSettings(EnvSettings):
     """日志配置"""
-    level: str = Field(default="INFO", description="日志级别")
-    format: str = Field(
-        default="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
-        description="日志格式"
-    )
-    file_rotation: str = Field(default="100 MB", description="日志文件轮转大小")
-    file_retention: str = Field(default="30 days", description="日志文件保留时间")
-    
-    class Config:
-        env_prefix = "LOG_"
-
-class TradingSettings(BaseSettings):
+    level: str = Field(default="INFO", description=_desc("日志级别"))
+    format: str = Field(default_factory=_default_log_format, description=_desc("日志格式"))
+    file_rotation: str = Field(default="100 MB", description=_desc("日志文件轮转大小"))
+    file_retention: str = Field(default="30 days", description=_desc("日志文件保留时间"))
+    
+    model_config = SettingsConfigDict(env_prefix="LOG_")
+
+class TradingSettings(EnvSettings):
     """交易配置"""
     # 风险控制
-    max_position_size: float = Field(default=0.1, description="单个持仓最大比例")
-    max_daily_loss: float = Field(default=0.05, description="单日最大亏损比例")
-    stop_loss_threshold: float = Field(default=0.08, description="止损阈值")
+    max_position_size: float = Field(default=0.1, description=_desc("单个持仓最大比例"))
+    max_daily_loss: float = Field(default=0.05, description=_desc("单日最大亏损比例"))
+    stop_loss_threshold: float = Field(default=0.08, description=_desc("止损阈值"))
     
     # 交易时间
-    market_open_time: str = Field(default="09:30", description="开市时间")
-    market_close_time: str = Field(default="15:00", description="收市时间")
+    market_open_time: str = Field(default="09:30", description=_desc("开市时间"))
+    market_close_time: str = Field(default="15:00", description=_desc("收市时间"))
     
     # 策略参数
-    analysis_lookback_days: int = Field(default=30, description="分析回看天数")
-    min_confidence_score: float = Field(default=0.6, description="最小置信度分数")
+    analysis_lookback_days: int = Field(default=30, description=_desc("分析回看天数"))
+    min_confidence_score: float = Field(default=0.6, description=_desc("最小置信度分数"))
     
-    class Config:
-        env_prefix = "TRADING_"
+    model_config = SettingsConfigDict(env_prefix="TRADING_")
 
-class Settings(BaseSettings):
+def _load_leaf_section(model, lite: bool):
+    """构建无校验器的叶子配置，启用轻量模式且已安装msgspec时使用只读Struct"""
+    if lite:
+        try:
+            from .lite_settings import load_struct
+        except ImportError:
+            logger.warning("未安装msgspec，LITE_SETTINGS已忽略")
+        else:
+            return load_struct(model)
+    return model.from_env()
+
+class Settings(EnvSettings):
     """主配置类"""
     # 应用基础配置
-    app_name: str = Field(default="TradingAgents", description="应用名称")
-    app_version: str = Field(default="1.0.0", description="应用版本")
-    debug: bool = Field(default=False, description="调试模式")
-    environment: str = Field(default="development", description="运行环境")
-    
-    # 各模块配置
-    database: DatabaseSettings = Field(default_factory=DatabaseSettings)
-    redis: RedisSettings = Field(default_factory=RedisSettings)
-    llm: LLMSettings = Field(default_factory=LLMSettings)
-    data_source: DataSourceSettings = Field(default_factory=DataSourceSettings)
-    security: SecuritySettings = Field(default_factory=SecuritySettings)
-    logging: LoggingSettings = Field(default_factory=LoggingSettings)
-    trading: TradingSettings = Field(default_factory=TradingSettings)
-    
-    @validator('environment')
+    app_name: str = Field(default="TradingAgents", description=_desc("应用名称"))
+    app_version: str = Field(default="1.0.0", description=_desc("应用版本"))
+    debug: bool = Field(default=False, description=_desc("调试模式"))
+    environment: str = Field(default="development", description=_desc("运行环境"))
+    lite_settings: bool = Field(default=False, description=_desc("Redis/日志/交易配置使用msgspec轻量结构"))
+    
+    # 各模块配置（首次访问时才构建，避免导入时解析全部环境变量）
+    @cached_property
+    def database(self) -> DatabaseSettings:
+        return DatabaseSettings.from_env()
+    
+    @cached_property
+    def redis(self) -> RedisSettings:
+        return _load_leaf_section(RedisSettings, self.lite_settings)
+    
+    @cached_property
+    def llm(self) -> LLMSettings:
+        return LLMSettings.from_env()
+    
+    @cached_property
+    def data_source(self) -> DataSourceSettings:
+        return DataSourceSettings.from_env()
+    
+    @cached_property
+    def security(self) -> SecuritySettings:
+        return SecuritySettings.from_env()
+    
+    @cached_property
+    def logging(self) -> LoggingSettings:
+        return _load_leaf_section(LoggingSettings, self.lite_settings)
+    
+    @cached_property
+    def trading(self) -> TradingSettings:
+        return _load_leaf_section(TradingSettings, self.lite_settings)
+    
+    @field_validator('environment')
+    @classmethod
     def validate_environment(cls, v):
         allowed = ['development', 'testing', 'staging', 'production']
         if v not in allowed:
             raise ValueError(f'Environment must be one of {allowed}')
         return v
     
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        case_sensitive = False
-
-# 全局配置实例
-settings = Settings()
+    model_config = SettingsConfigDict(case_sensitive=False)
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    """获取配置实例"""
-    return settings
-
-def reload_settings():
-    """重新加载配置"""
-    global settings
-    settings = Settings()
-    return settings 
\ No newline at end of file
+    """获取配置实例（首次调用时构建，进程内只构建一次）"""
+    return Settings.from_env()
+
+def reload_settings() -> Settings:
+    """重新加载配置（重新读取.env和环境变量）"""
+    _load_dotenv()
+    _env_snapshot.cache_clear()
+    _env_section.cache_clear()
+    get_settings.cache_clear()
+    return get_settings()
@@ -9,7 +9,14 @@ import os
 import sys
 import subprocess
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional
+
+# 版本查询命令
+DOCKER_VERSION_CMD = ('docker', '--version')
+DOCKER_COMPOSE_VERSION_CMD = ('docker-compose', '--version')
 
 def check_python_version():
     """检查Python版本"""
@@ -20,28 +27,41 @@ def check_python_version():
     print(f"✅ Python版本检查通过: {sys.version}")
     return True
 
-def check_docker():
-    """检查Docker是否安装"""
+@lru_cache(maxsize=None)
+def get_tool_version(*command: str) -> Optional[str]:
+    """执行版本查询命令，返回输出（未安装时返回None），结果在进程内缓存"""
     try:
-        result = subprocess.run(['docker', '--version'], capture_output=True, text=True)
+        result = subprocess.run(list(command), capture_output=True, text=True)
         if result.returncode == 0:
-            print(f"✅ Docker已安装: {result.stdout.strip()}")
-            return True
+            return result.stdout.strip()
     except FileNotFoundError:
         pass
+    return None
+
+def prefetch_tool_versions():
+    """并行查询Docker和Docker Compose版本，重叠两次子进程启动的耗时"""
+    commands = (DOCKER_VERSION_CMD, DOCKER_COMPOSE_VERSION_CMD)
+    with ThreadPoolExecutor(max_workers=len(commands)) as executor:
+        list(executor.map(lambda command: get_tool_version(*command), commands))
+
+@lru_cache(maxsize=1)
+def check_docker():
+    """检查Docker是否安装"""
+    version = get_tool_version(*DOCKER_VERSION_CMD)
+    if version:
+        print(f"✅ Docker已安装: {version}")
+        return True
     
     print("❌ Docker未安装或不在PATH中")
     return False
 
+@lru_cache(maxsize=1)
 def check_docker_compose():
     """检查Docker Compose是否安装"""
-    try:
-        result = subprocess.run(['docker-compose', '--version'], capture_output=True, text=True)
-        if result.returncode == 0:
-            print(f"✅ Docker Compose已安装: {result.stdout.strip()}")
-            return True
-    except FileNotFoundError:
-        pass
+    version = get_tool_version(*DOCKER_COMPOSE_VERSION_CMD)
+    if version:
+        print(f"✅ Docker Compose已安装: {version}")
+        return True
     
     print("❌ Docker Compose未安装或不在PATH中")
     return False
@@ -145,6 +165,8 @@ def main():
     print("🚀 TradingAgents 开发环境设置")
     print("=" * 50)
     
+    prefetch_tool_versions()
+    
     checks = [
         ("Python版本检查", check_python_version),
         ("Docker检查", check_docker),
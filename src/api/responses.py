@@ -0,0 +1,17 @@
+"""
+API响应类
+
+提供基于orjson的JSON响应，作为应用默认响应类。
+"""
+
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """使用orjson序列化的JSON响应（C实现，比标准库json快数倍）"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
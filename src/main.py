@@ -7,42 +7,97 @@ TradingAgents 系统主入口
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from starlette.datastructures import State
 from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Optional, Tuple
+import asyncio
 import logging
+import logging.config
+import sys
 import time
 import uvicorn
 
-from config.settings import get_settings
+from config.settings import Settings, get_settings
 from config.database import init_db, check_db_connection
-from config.redis import check_redis_connection
+from config.redis import check_redis_connection, close_async_cache
+from src.api.responses import ORJSONResponse
 
-# 获取配置
-settings = get_settings()
-
-# 配置日志
-logging.basicConfig(
-    level=getattr(logging, settings.logging.level),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# 日志级别（无效的级别名称回退到INFO）
+LOG_LEVEL = logging.getLevelNamesMapping().get(
+    get_settings().logging.level.upper(), logging.INFO
 )
+
+# 配置日志（启动时配置一次，各模块logger继承根级别）
+logging.config.dictConfig({
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "default": {"format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s"}
+    },
+    "handlers": {
+        "console": {"class": "logging.StreamHandler", "formatter": "default"}
+    },
+    "root": {"level": LOG_LEVEL, "handlers": ["console"]},
+})
 logger = logging.getLogger(__name__)
 
+# 生产环境允许的CORS来源和可信主机
+CORS_ALLOWED_ORIGINS = ("http://localhost:3000",)
+TRUSTED_HOSTS = ("localhost", "127.0.0.1", "0.0.0.0")
+
+# 连接检查结果的缓存时间（秒），避免探针密集请求时反复访问数据库和Redis
+PROBE_CACHE_TTL = 2.0
+
+
+async def probe(state: State, name: str, check: Callable[[], bool]) -> bool:
+    """
+    在线程池中执行同步连接检查，TTL内复用结果，不阻塞事件循环
+    
+    结果缓存在app.state.probes中（名称 -> (过期时间, 检查任务)），启动检查与/health共享，
+    并发请求共享同一个进行中的检查。过期时间从检查完成时起算，检查未完成前不会发起新的检查。
+    """
+    probes: Optional[Dict[str, Tuple[float, asyncio.Future]]] = getattr(state, "probes", None)
+    if probes is None:
+        probes = state.probes = {}
+    
+    cached = probes.get(name)
+    if cached is None or (cached[1].done() and cached[0] <= time.monotonic()):
+        task = asyncio.ensure_future(asyncio.to_thread(check))
+        
+        def expire_from_completion(done: asyncio.Future) -> None:
+            if probes.get(name, (0.0, None))[1] is done:
+                probes[name] = (time.monotonic() + PROBE_CACHE_TTL, done)
+        
+        task.add_done_callback(expire_from_completion)
+        cached = probes[name] = (time.monotonic() + PROBE_CACHE_TTL, task)
+    
+    # 共享的检查任务不随单个调用方取消（如客户端断开、探针超时）
+    return await asyncio.shield(cached[1])
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """应用生命周期管理"""
+    settings = get_settings()
+    
     # 启动时执行
     logger.info("🚀 启动 TradingAgents 系统...")
     
-    # 检查数据库连接
-    if not check_db_connection():
-        logger.error("❌ 数据库连接失败，请检查配置")
-        raise RuntimeError("数据库连接失败")
+    # 并发检查数据库和Redis连接，两者都完成后再处理结果
+    db_ok, redis_ok = await asyncio.gather(
+        probe(app.state, "database", check_db_connection),
+        probe(app.state, "redis", check_redis_connection)
+    )
     
-    # 检查Redis连接
-    if not check_redis_connection():
+    # Redis失败不阻止应用启动
+    if not redis_ok:
         logger.warning("⚠️ Redis连接失败，缓存功能将不可用")
-        # Redis失败不阻止应用启动
+    
+    if not db_ok:
+        logger.error("❌ 数据库连接失败，请检查配置")
+        raise RuntimeError(
+            "数据库连接失败" + ("" if redis_ok else "，Redis连接同样失败")
+        )
     
     # 初始化数据库
     try:
@@ -54,37 +109,48 @@ async def lifespan(app: FastAPI):
         if not settings.debug:
             raise
     
+    # 应用信息运行期间不变，预先生成供/info直接返回
+    app.state.info_payload = build_info_payload(settings)
+    
     logger.info("✅ TradingAgents 系统启动完成")
     
     yield
     
     # 关闭时执行
     logger.info("🛑 关闭 TradingAgents 系统...")
+    await close_async_cache()
 
 
 # 创建FastAPI应用
 app = FastAPI(
-    title=settings.app_name,
-    version=settings.app_version,
+    title=get_settings().app_name,
+    version=get_settings().app_version,
     description="基于多智能体LLM的智能股票筛选和交易系统",
-    debug=settings.debug,
+    debug=get_settings().debug,
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
-# 添加CORS中间件
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"] if settings.debug else ["http://localhost:3000"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# 添加CORS中间件（入口网关已处理CORS时可通过SECURITY_CORS_ENABLED=false关闭）
+if get_settings().security.cors_enabled:
+    if get_settings().debug:
+        # 调试模式允许任意来源：正则在启动时编译一次，并回显请求来源以兼容携带凭证的请求
+        cors_origins = {"allow_origin_regex": ".*"}
+    else:
+        cors_origins = {"allow_origins": list(CORS_ALLOWED_ORIGINS)}
+    app.add_middleware(
+        CORSMiddleware,
+        **cors_origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
 
 # 添加可信主机中间件（生产环境）
-if not settings.debug:
+if not get_settings().debug:
     app.add_middleware(
         TrustedHostMiddleware,
-        allowed_hosts=["localhost", "127.0.0.1", "0.0.0.0"]
+        allowed_hosts=list(TRUSTED_HOSTS)
     )
 
 
@@ -92,15 +158,17 @@ if not settings.debug:
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     """记录所有HTTP请求"""
-    start_time = time.time()
+    if not logger.isEnabledFor(logging.INFO):
+        return await call_next(request)
+    
+    start_time = time.perf_counter_ns()
     
     response = await call_next(request)
     
-    process_time = time.time() - start_time
+    process_time = (time.perf_counter_ns() - start_time) / 1e9
     logger.info(
-        f"{request.method} {request.url.path} - "
-        f"Status: {response.status_code} - "
-        f"Time: {process_time:.3f}s"
+        "%s %s - Status: %d - Time: %.3fs",
+        request.method, request.url.path, response.status_code, process_time
     )
     
     return response
@@ -111,8 +179,9 @@ async def log_requests(request: Request, call_next):
 async def global_exception_handler(request: Request, exc: Exception):
     """全局异常处理器"""
     logger.error(f"未处理的异常: {exc}", exc_info=True)
+    settings = get_settings()
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "内部服务器错误",
@@ -126,6 +195,7 @@ async def global_exception_handler(request: Request, exc: Exception):
 @app.get("/")
 async def root():
     """根路径"""
+    settings = get_settings()
     return {
         "message": f"欢迎使用 {settings.app_name}",
         "version": settings.app_version,
@@ -135,14 +205,15 @@ async def root():
 
 
 @app.get("/health")
-async def health_check():
+async def health_check(request: Request):
     """健康检查端点"""
+    settings = get_settings()
     
-    # 检查数据库连接
-    db_status = check_db_connection()
-    
-    # 检查Redis连接
-    redis_status = check_redis_connection()
+    # 检查数据库和Redis连接（启动检查及近期探测的结果在TTL内直接复用）
+    db_status, redis_status = await asyncio.gather(
+        probe(request.app.state, "database", check_db_connection),
+        probe(request.app.state, "redis", check_redis_connection)
+    )
     
     # 整体健康状态
     healthy = db_status and redis_status
@@ -159,12 +230,20 @@ async def health_check():
         "version": settings.app_version
     }
     
-    return JSONResponse(content=health_info, status_code=status_code)
+    return ORJSONResponse(content=health_info, status_code=status_code)
 
 
 @app.get("/info")
-async def app_info():
-    """应用信息端点"""
+async def app_info(request: Request):
+    """应用信息端点（返回启动时生成的内容）"""
+    info_payload = getattr(request.app.state, "info_payload", None)
+    if info_payload is None:
+        info_payload = request.app.state.info_payload = build_info_payload(get_settings())
+    return info_payload
+
+
+def build_info_payload(settings: Settings) -> Dict[str, Any]:
+    """生成应用信息（运行期间不变，启动时计算一次）"""
     return {
         "name": settings.app_name,
         "version": settings.app_version,
@@ -222,11 +301,18 @@ def create_app() -> FastAPI:
 
 if __name__ == "__main__":
     # 直接运行时的配置
+    settings = get_settings()
+    
+    # uvloop与热重载不兼容，且不支持Windows，这两种情况使用默认asyncio事件循环
+    use_uvloop = not settings.debug and sys.platform != "win32"
+    
     uvicorn.run(
         "src.main:app",
         host="0.0.0.0",
         port=8000,  # 使用固定端口
+        loop="uvloop" if use_uvloop else "asyncio",
+        http="httptools",
         reload=settings.debug,
-        log_level=settings.logging.level.lower(),
+        log_level=logging.getLevelName(LOG_LEVEL).lower(),
         access_log=settings.debug
     ) 
\ No newline at end of file
@@ -0,0 +1,96 @@
+"""
+缓存编解码测试
+使用fakeredis验证CacheManager的读写往返和旧数据兼容
+"""
+
+import math
+
+import fakeredis
+import pytest
+
+from config.redis import CacheManager
+
+
+@pytest.fixture
+def client():
+    return fakeredis.FakeRedis()
+
+
+@pytest.fixture
+def cache(client):
+    return CacheManager(client)
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "hello",
+        "",
+        "123",
+        "Success",
+        "MSFT",
+        "中文",
+        5,
+        0,
+        3.14,
+        True,
+        False,
+        {"close": 10.5, "volume": 1000},
+        [1, 2.5, "x"],
+        math.nan,
+        math.inf,
+        -math.inf,
+        {"rsi": [math.nan, 55.2, math.inf], "macd": [None, -math.inf]},
+    ],
+)
+def test_round_trip(cache, value):
+    assert cache.set("k", value)
+    result = cache.get("k")
+    # 比较repr，使NaN与自身相等
+    assert repr(result) == repr(value)
+    assert type(result) is type(value)
+
+
+def test_round_trip_none(cache):
+    assert cache.set("k", None)
+    assert cache.exists("k")
+    assert cache.get("k") is None
+
+
+def test_round_trip_packed(cache):
+    value = {"open": [1.0, 2.0], "close": [1.5, 2.5], 600519: "int key"}
+    assert cache.set("k", value, packed=True)
+    assert cache.get("k") == value
+
+
+def test_bytes_read_back_as_str(cache):
+    assert cache.set("k", b"raw")
+    assert cache.get("k") == "raw"
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        (b"Success", "Success"),
+        (b"MSFT", "MSFT"),
+        (b"JPM", "JPM"),
+        (b"5", 5),
+        (b'{"a": 1}', {"a": 1}),
+        ("中文".encode(), "中文"),
+    ],
+)
+def test_legacy_untagged_values(client, cache, raw, expected):
+    client.set("k", raw)
+    assert cache.get("k") == expected
+
+
+def test_mget_mset(cache):
+    mapping = {"a": 1, "b": "text", "c": {"x": [1, 2]}}
+    assert cache.mset(mapping, expire=60)
+    assert cache.mget(["a", "b", "c", "missing"]) == [1, "text", {"x": [1, 2]}, None]
+
+
+def test_clear_pattern(cache):
+    cache.mset({"stock:1": 1, "stock:2": 2, "other": 3})
+    assert cache.clear_pattern("stock:*") == 2
+    assert cache.mget(["stock:1", "stock:2", "other"]) == [None, None, 3]
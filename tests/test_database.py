@@ -0,0 +1,110 @@
+"""
+数据库连接测试
+使用SQLite验证检出时的空闲连接检测和run_with_retry的重试边界
+"""
+
+from functools import partial
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+
+import config.database as database
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=1, max_overflow=0)
+    event.listen(engine, "checkin", database._record_checkin_time)
+    event.listen(engine, "checkout", partial(database._ping_idle_connection, engine.dialect, 0))
+    yield engine
+    engine.dispose()
+
+
+def test_stale_idle_connection_is_replaced_on_checkout(engine, monkeypatch):
+    with engine.connect() as conn:
+        stale = conn.connection.dbapi_connection
+
+    pings = []
+
+    def ping(dbapi_connection):
+        pings.append(dbapi_connection)
+        if dbapi_connection is stale:
+            raise engine.dialect.loaded_dbapi.OperationalError("server closed the connection")
+        return True
+
+    monkeypatch.setattr(engine.dialect, "do_ping", ping)
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+        assert conn.connection.dbapi_connection is not stale
+    assert pings == [stale]
+
+
+def test_fresh_connection_is_not_pinged(engine, monkeypatch):
+    pings = []
+    monkeypatch.setattr(engine.dialect, "do_ping", lambda c: pings.append(c) or True)
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert pings == []
+
+
+class FlakySession:
+    """模拟会话：记录提交与回滚次数，可指定提交时抛出的异常"""
+
+    def __init__(self, commit_error=None):
+        self.commit_error = commit_error
+        self.commits = 0
+        self.rollbacks = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def commit(self):
+        self.commits += 1
+        if self.commit_error:
+            raise self.commit_error
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def _disconnect_error():
+    return DBAPIError("SELECT 1", {}, Exception("connection lost"), connection_invalidated=True)
+
+
+def test_run_with_retry_retries_invalidated_operation(monkeypatch):
+    sessions = []
+
+    def new_session():
+        sessions.append(FlakySession())
+        return sessions[-1]
+
+    monkeypatch.setattr(database, "get_session_factory", lambda: new_session)
+    calls = []
+
+    def operation(db):
+        calls.append(db)
+        if len(calls) == 1:
+            raise _disconnect_error()
+        return "ok"
+
+    assert database.run_with_retry(operation) == "ok"
+    assert len(calls) == 2
+    assert sessions[-1].commits == 1
+
+
+def test_run_with_retry_does_not_replay_failed_commit(monkeypatch):
+    session = FlakySession(commit_error=_disconnect_error())
+    monkeypatch.setattr(database, "get_session_factory", lambda: lambda: session)
+    calls = []
+
+    with pytest.raises(DBAPIError):
+        database.run_with_retry(calls.append)
+    assert len(calls) == 1
+    assert session.commits == 1
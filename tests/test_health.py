@@ -0,0 +1,99 @@
+"""
+健康检查探针测试
+验证probe共享进行中的检查、调用方取消不影响共享检查，以及TTL过期后重新检查
+"""
+
+import asyncio
+import threading
+
+import pytest
+from starlette.datastructures import State
+
+import src.main as main
+from src.main import probe
+
+
+class FakeCheck:
+    """可控的连接检查：调用release前一直阻塞，记录调用次数"""
+
+    def __init__(self, result: bool = True):
+        self.result = result
+        self.calls = 0
+        self.released = threading.Event()
+
+    def release(self) -> None:
+        self.released.set()
+
+    def __call__(self) -> bool:
+        self.calls += 1
+        self.released.wait(timeout=5)
+        return self.result
+
+
+def test_concurrent_callers_share_in_flight_check():
+    check = FakeCheck()
+
+    async def run():
+        state = State()
+        waiters = [asyncio.ensure_future(probe(state, "db", check)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        check.release()
+        return await asyncio.gather(*waiters)
+
+    assert asyncio.run(run()) == [True, True, True]
+    assert check.calls == 1
+
+
+def test_cancelled_caller_does_not_cancel_shared_check():
+    check = FakeCheck()
+
+    async def run():
+        state = State()
+        first = asyncio.ensure_future(probe(state, "db", check))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+        second = asyncio.ensure_future(probe(state, "db", check))
+        check.release()
+        return await second
+
+    assert asyncio.run(run()) is True
+    assert check.calls == 1
+
+
+def test_reprobe_after_ttl(monkeypatch):
+    monkeypatch.setattr(main, "PROBE_CACHE_TTL", 0.05)
+    check = FakeCheck()
+    check.release()
+
+    async def run():
+        state = State()
+        assert await probe(state, "db", check)
+        assert await probe(state, "db", check)
+        assert check.calls == 1
+
+        await asyncio.sleep(0.1)
+        check.result = False
+        return await probe(state, "db", check)
+
+    assert asyncio.run(run()) is False
+    assert check.calls == 2
+
+
+def test_slow_check_is_not_restarted_before_completion(monkeypatch):
+    monkeypatch.setattr(main, "PROBE_CACHE_TTL", 0.0)
+    check = FakeCheck()
+
+    async def run():
+        state = State()
+        first = asyncio.ensure_future(probe(state, "db", check))
+        await asyncio.sleep(0.05)
+        second = asyncio.ensure_future(probe(state, "db", check))
+        await asyncio.sleep(0.05)
+        check.release()
+        return await asyncio.gather(first, second)
+
+    assert asyncio.run(run()) == [True, True]
+    assert check.calls == 1
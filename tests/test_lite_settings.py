@@ -0,0 +1,36 @@
+"""
+轻量配置测试
+验证msgspec结构与Pydantic配置类接受相同的取值，并在构建时计算派生属性
+"""
+
+import pytest
+
+pytest.importorskip("msgspec")
+
+from config.lite_settings import load_struct
+from config.settings import DataSourceSettings, RedisSettings, reload_settings
+
+
+@pytest.fixture(autouse=True)
+def restore_settings():
+    """测试结束（环境变量恢复）后重新加载配置，避免影响其他测试"""
+    yield
+    reload_settings()
+
+
+@pytest.mark.parametrize("raw, expected", [("yes", True), ("on", True), ("0", False), ("false", False)])
+def test_bool_coercion_matches_pydantic(monkeypatch, raw, expected):
+    monkeypatch.setenv("DATA_YAHOO_FINANCE_ENABLED", raw)
+    reload_settings()
+    assert DataSourceSettings.from_env().yahoo_finance_enabled is expected
+    assert load_struct(DataSourceSettings).yahoo_finance_enabled is expected
+
+
+def test_url_computed_once_at_load(monkeypatch):
+    monkeypatch.setenv("REDIS_PASSWORD", "pw")
+    monkeypatch.setenv("REDIS_PORT", "6380")
+    reload_settings()
+    struct = load_struct(RedisSettings)
+    assert struct.port == 6380
+    assert struct.url == RedisSettings.from_env().url == "redis://:pw@localhost:6380/0"
+    assert "url" in type(struct).__struct_fields__
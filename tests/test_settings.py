@@ -0,0 +1,73 @@
+"""
+配置加载测试
+验证.env与进程环境变量的优先级，以及reload_settings对.env修改的同步
+"""
+
+import os
+
+import pytest
+
+from config import settings as settings_module
+from config.settings import DatabaseSettings, reload_settings
+
+
+@pytest.fixture(autouse=True)
+def restore_settings():
+    """测试结束（环境变量恢复）后重新加载配置，避免影响其他测试"""
+    yield
+    reload_settings()
+
+
+@pytest.fixture
+def env_file(tmp_path, monkeypatch):
+    """在临时目录中写入.env，测试结束后删除"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("DB_HOST", raising=False)
+    monkeypatch.delenv("APP_NAME", raising=False)
+    path = tmp_path / ".env"
+    yield path
+    path.unlink()
+
+
+def test_reload_picks_up_env_file_edit(env_file):
+    env_file.write_text("DB_HOST=envhost\nAPP_NAME=one\n")
+    settings = reload_settings()
+    assert settings.database.host == "envhost"
+    assert settings.app_name == "one"
+
+    env_file.write_text("DB_HOST=edited\nAPP_NAME=two\n")
+    settings = reload_settings()
+    assert settings.database.host == "edited"
+    assert settings.app_name == "two"
+
+
+def test_reload_drops_key_deleted_from_env_file(env_file):
+    env_file.write_text("DB_HOST=envhost\n")
+    reload_settings()
+
+    env_file.write_text("")
+    settings = reload_settings()
+    assert "DB_HOST" not in os.environ
+    assert settings.database.host == "localhost"
+
+
+def test_process_env_wins_over_env_file(env_file, monkeypatch):
+    monkeypatch.setenv("DB_HOST", "process")
+    env_file.write_text("DB_HOST=envhost\n")
+    assert reload_settings().database.host == "process"
+
+
+def test_runtime_override_survives_reload(env_file, monkeypatch):
+    env_file.write_text("DB_HOST=envhost\n")
+    assert reload_settings().database.host == "envhost"
+
+    monkeypatch.setenv("DB_HOST", "runtime-override")
+    assert reload_settings().database.host == "runtime-override"
+    assert os.environ["DB_HOST"] == "runtime-override"
+    assert "DB_HOST" not in settings_module._dotenv_written
+
+
+def test_direct_construction_reads_environment(monkeypatch):
+    monkeypatch.setenv("DB_HOST", "direct")
+    assert DatabaseSettings().host == "direct"
+    assert reload_settings().database.host == "direct"